@@ -2,38 +2,78 @@
 Модуль конфигурации для приложения автоматизации печати штрихкодов Ozon
 """
 import os
+import atexit
 import logging
+import logging.handlers
+import queue
+import threading
+from functools import lru_cache
 from pathlib import Path
-from datetime import datetime
+from datetime import date
 from dotenv import load_dotenv
 
-# Загрузка переменных окружения из .env файла
-load_dotenv()
+# Загрузка переменных окружения из .env файла (однократно, в том числе
+# при повторной загрузке модуля через importlib.reload). При PRODUCTION=1
+# окружение задается извне, и .env не читается
+_DOTENV_LOADED = globals().get('_DOTENV_LOADED', False)
+if not _DOTENV_LOADED:
+    if not os.environ.get('PRODUCTION'):
+        load_dotenv(override=False, interpolate=False)
+    _DOTENV_LOADED = True
+
+
+@lru_cache(maxsize=None)
+def _env(key, default=''):
+    """Получить значение переменной окружения (с кэшированием)"""
+    return os.environ.get(key, default)
+
+
+@lru_cache(maxsize=1)
+def _log_filepath_for(logs_dir, day):
+    """Путь к файлу логов за указанный день (кэшируется до смены даты)"""
+    return logs_dir / f'ozon_automation_{day:%Y-%m-%d}.log'
 
 
 class Config:
     """Класс конфигурации приложения"""
 
     # Ozon API настройки
-    OZON_CLIENT_ID = os.getenv('OZON_CLIENT_ID', '')
-    OZON_API_KEY = os.getenv('OZON_API_KEY', '')
+    OZON_CLIENT_ID = _env('OZON_CLIENT_ID', '')
+    OZON_API_KEY = _env('OZON_API_KEY', '')
     OZON_API_URL = 'https://api-seller.ozon.ru'
 
     # Директории
     BASE_DIR = Path(__file__).parent
-    OUTPUT_DIR = Path(os.getenv('OUTPUT_DIR', './output'))
-    LOGS_DIR = Path(os.getenv('LOGS_DIR', './logs'))
+    OUTPUT_DIR = Path(_env('OUTPUT_DIR', './output'))
+    LOGS_DIR = Path(_env('LOGS_DIR', './logs'))
+    _OUTPUT_DIR_STR = str(OUTPUT_DIR)
+
+    # Логирование: размер буфера записей для файла и период его сброса (сек)
+    LOG_BUFFER_CAPACITY = 512
+    LOG_FLUSH_INTERVAL = 30
 
     # Принтер
-    DEFAULT_PRINTER = os.getenv('DEFAULT_PRINTER', '')
+    DEFAULT_PRINTER = _env('DEFAULT_PRINTER', '')
+    # Печать на Windows без программы просмотра PDF (принтер принимает PDF сам)
+    PRINT_RAW = _env('PRINT_RAW', '').lower() in ('1', 'true', 'yes')
 
     # Создание директорий, если их нет
     OUTPUT_DIR.mkdir(exist_ok=True)
     LOGS_DIR.mkdir(exist_ok=True)
 
+    # Результат валидации (настройки не меняются после загрузки модуля)
+    _validation_errors = None
+
     @classmethod
     def validate(cls):
-        """Валидация конфигурации"""
+        """Валидация конфигурации (результат вычисляется один раз)"""
+        if cls._validation_errors is not None:
+            return cls._validation_errors
+
+        if cls.OZON_CLIENT_ID and cls.OZON_API_KEY:
+            cls._validation_errors = ()
+            return cls._validation_errors
+
         errors = []
 
         if not cls.OZON_CLIENT_ID:
@@ -42,29 +82,80 @@ class Config:
         if not cls.OZON_API_KEY:
             errors.append("OZON_API_KEY не указан в .env файле")
 
-        return errors
+        cls._validation_errors = tuple(errors)
+        return cls._validation_errors
 
     @classmethod
     def get_log_filepath(cls):
         """Получить путь к файлу логов"""
-        date_str = datetime.now().strftime('%Y-%m-%d')
-        return cls.LOGS_DIR / f'ozon_automation_{date_str}.log'
+        return _log_filepath_for(cls.LOGS_DIR, date.today())
 
     @classmethod
+    @lru_cache(maxsize=32)
     def get_output_filepath(cls, supply_id, suffix='полная'):
         """Получить путь к выходному PDF файлу"""
-        return cls.OUTPUT_DIR / f'Поставка_{supply_id}_{suffix}.pdf'
+        return Path(f'{cls._OUTPUT_DIR_STR}/Поставка_{supply_id}_{suffix}.pdf')
+
+
+def _start_periodic_flush(handler, interval):
+    """Запустить фоновый поток, периодически сбрасывающий буфер обработчика"""
+    stop_event = threading.Event()
+
+    def run():
+        while not stop_event.wait(interval):
+            handler.flush()
+
+    thread = threading.Thread(target=run, name='log-flush', daemon=True)
+    thread.start()
+    return stop_event
+
+
+# Сохраняется при повторной загрузке модуля (importlib.reload), чтобы не
+# запускать второй слушатель очереди и не открывать файл логов повторно
+_LOGGING_CONFIGURED = globals().get('_LOGGING_CONFIGURED', False)
+
+# Общий форматтер для файла и консоли
+_FMT = logging.Formatter(
+    '[%(asctime)s] %(levelname)s: %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    validate=False
+)
 
 
 def setup_logging():
-    """Настройка логирования"""
+    """Настройка логирования (повторные вызовы не добавляют обработчики)"""
+    global _LOGGING_CONFIGURED
+    if _LOGGING_CONFIGURED:
+        return logging.getLogger()
+
     log_filepath = Config.get_log_filepath()
 
-    # Создаем форматтер
-    formatter = logging.Formatter(
-        '[%(asctime)s] %(levelname)s: %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
+    # Файловый обработчик: записи копятся в буфере и пишутся пачками,
+    # ERROR и выше сбрасываются сразу
+    file_target = logging.FileHandler(log_filepath, encoding='utf-8')
+    file_target.setFormatter(_FMT)
+    file_handler = logging.handlers.MemoryHandler(
+        capacity=Config.LOG_BUFFER_CAPACITY,
+        flushLevel=logging.ERROR,
+        target=file_target,
+        flushOnClose=True
+    )
+    flush_stop = _start_periodic_flush(file_handler, Config.LOG_FLUSH_INTERVAL)
+
+    # Консольный обработчик
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(_FMT)
+
+    # Запись в файл и консоль выполняется в отдельном потоке слушателя,
+    # вызывающий поток только помещает запись в очередь
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
     )
+    listener.start()
+    atexit.register(file_handler.flush)
+    atexit.register(flush_stop.set)
+    atexit.register(listener.stop)
 
     # Настраиваем корневой логгер
     logger = logging.getLogger()
@@ -72,17 +163,9 @@ def setup_logging():
 
     # Удаляем существующие обработчики
     logger.handlers.clear()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
 
-    # Файловый обработчик
-    file_handler = logging.FileHandler(log_filepath, encoding='utf-8')
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-
-    # Консольный обработчик
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-
+    _LOGGING_CONFIGURED = True
     return logger
 
 
@@ -3,29 +3,66 @@ GUI интерфейс для автоматизации печати штрих
 """
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-import threading
 import logging
-from pathlib import Path
+import os
+import queue
+import threading
 from typing import Optional
 
 from config import Config
 from ozon_api import OzonAPI, OzonAPIError
 from pdf_processor import PDFProcessor, PDFProcessorError
 
+logger = logging.getLogger(__name__)
+
+# Форматтер для лога в окне приложения
+_TEXT_FMT = logging.Formatter(
+    '[%(asctime)s] %(levelname)s: %(message)s',
+    datefmt='%H:%M:%S',
+    validate=False
+)
+
 
 class TextHandler(logging.Handler):
     """Обработчик логов для вывода в текстовое поле"""
 
+    # Период опроса очереди сообщений из UI потока (мс)
+    POLL_INTERVAL_MS = 100
+    # Максимум сообщений, выводимых за один опрос
+    MAX_BATCH = 500
+    # Максимум строк, хранимых в текстовом поле (старые строки удаляются)
+    MAX_LINES = 10000
+
     def __init__(self, text_widget):
         super().__init__()
         self.text_widget = text_widget
+        self._queue = queue.Queue()
+        self.text_widget.after(self.POLL_INTERVAL_MS, self._drain)
 
     def emit(self, record):
-        msg = self.format(record)
-        self.text_widget.configure(state='normal')
-        self.text_widget.insert(tk.END, msg + '\n')
-        self.text_widget.configure(state='disabled')
-        self.text_widget.see(tk.END)
+        # Вызывается из любого потока: только кладем сообщение в очередь,
+        # виджет обновляется исключительно из UI потока в _drain
+        self._queue.put_nowait(self.format(record))
+
+    def _drain(self):
+        """Вывести накопленные сообщения в текстовое поле одной вставкой"""
+        messages = []
+        try:
+            while len(messages) < self.MAX_BATCH:
+                messages.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        if messages:
+            self.text_widget.configure(state='normal')
+            self.text_widget.insert(tk.END, '\n'.join(messages) + '\n')
+            line_count = int(self.text_widget.index('end-1c').split('.')[0])
+            if line_count > self.MAX_LINES:
+                self.text_widget.delete('1.0', f'{line_count - self.MAX_LINES}.0')
+            self.text_widget.configure(state='disabled')
+            self.text_widget.see(tk.END)
+
+        self.text_widget.after(self.POLL_INTERVAL_MS, self._drain)
 
 
 class OzonBarcodeGUI:
@@ -46,6 +83,13 @@ class OzonBarcodeGUI:
         # Флаг выполнения
         self.is_processing = False
 
+        # Единственный фоновый поток для обработки и проверки API. Поток
+        # служебный (daemon) и не задерживает выход при закрытии окна
+        self._tasks = queue.Queue()
+        self._busy = False
+        self._worker = threading.Thread(target=self._worker_loop, name='ozon-worker', daemon=True)
+        self._worker.start()
+
         # Создание интерфейса
         self.create_widgets()
         self.setup_logging()
@@ -181,16 +225,15 @@ class OzonBarcodeGUI:
 
     def setup_logging(self):
         """Настроить вывод логов в текстовое поле"""
+        root_logger = logging.getLogger()
+        if any(isinstance(h, TextHandler) for h in root_logger.handlers):
+            return
+
         text_handler = TextHandler(self.log_text)
-        formatter = logging.Formatter(
-            '[%(asctime)s] %(levelname)s: %(message)s',
-            datefmt='%H:%M:%S'
-        )
-        text_handler.setFormatter(formatter)
+        text_handler.setFormatter(_TEXT_FMT)
 
         # Добавляем обработчик к корневому логгеру
-        logger = logging.getLogger()
-        logger.addHandler(text_handler)
+        root_logger.addHandler(text_handler)
 
     def check_config(self):
         """Проверить конфигурацию при запуске"""
@@ -244,12 +287,18 @@ class OzonBarcodeGUI:
             messagebox.showerror("Ошибка", "Выберите ZIP архив")
             return False
 
-        if not Path(zip_path).exists():
+        try:
+            os.stat(zip_path)
+        except OSError:
             messagebox.showerror("Ошибка", f"Файл не найден:\n{zip_path}")
             return False
 
         return True
 
+    def _ui(self, func, *args):
+        """Выполнить вызов в UI потоке (для использования из фоновых потоков)"""
+        self.root.after(0, func, *args)
+
     def set_processing(self, is_processing: bool):
         """Установить состояние обработки"""
         self.is_processing = is_processing
@@ -265,47 +314,75 @@ class OzonBarcodeGUI:
             self.progress.stop()
             self.status_var.set("Готов к работе")
 
+    def _worker_loop(self):
+        """Цикл фонового потока: выполнять задачи из очереди по одной"""
+        while True:
+            func, args = self._tasks.get()
+            try:
+                func(*args)
+            except Exception as e:
+                logger.error(f"Ошибка фоновой задачи: {str(e)}", exc_info=True)
+            finally:
+                self._busy = False
+
+    def _submit(self, func, *args):
+        """Поставить задачу в очередь фонового потока"""
+        self._busy = True
+        self._tasks.put((func, args))
+
+    def _is_busy(self) -> bool:
+        """Выполняется ли фоновая задача"""
+        return self._busy
+
     def process_supply(self):
         """Обработать поставку"""
+        if self._is_busy():
+            return
+
         if not self.validate_inputs():
             return
 
-        # Запускаем в отдельном потоке
-        thread = threading.Thread(target=self._process_supply_thread)
-        thread.daemon = True
-        thread.start()
+        # Значения полей читаем в UI потоке, в фоновый поток передаем копии
+        supply_id = int(self.supply_id_var.get().strip())
+        zip_path = self.zip_path_var.get().strip()
+        auto_print = self.auto_print_var.get()
+        printer_name = self.printer_name_var.get().strip() if auto_print else None
 
-    def _process_supply_thread(self):
-        """Поток обработки поставки"""
-        try:
-            self.set_processing(True)
+        self.set_processing(True)
 
-            supply_id = int(self.supply_id_var.get().strip())
-            zip_path = self.zip_path_var.get().strip()
-            auto_print = self.auto_print_var.get()
-            printer_name = self.printer_name_var.get().strip() if auto_print else None
+        # Запускаем в фоновом потоке
+        self._submit(self._process_supply_thread, supply_id, zip_path, auto_print, printer_name)
 
-            logger = logging.getLogger(__name__)
+    def _process_supply_thread(
+        self,
+        supply_id: int,
+        zip_path: str,
+        auto_print: bool,
+        printer_name: Optional[str]
+    ):
+        """Поток обработки поставки"""
+        try:
             logger.info(f"Начало обработки поставки {supply_id}")
 
             # API
-            api = OzonAPI()
-            items = api.get_supply_items(supply_id)
+            with OzonAPI() as api:
+                items = api.get_supply_items(supply_id)
 
-            if not items:
-                messagebox.showerror("Ошибка", "Поставка не содержит товаров")
-                return
+                if not items:
+                    self._ui(messagebox.showerror, "Ошибка", "Поставка не содержит товаров")
+                    return
+
+                # Статистика
+                stats = api.get_supply_statistics(supply_id, items=items)
 
-            # Статистика
-            stats = api.get_supply_statistics(supply_id)
             logger.info(f"Уникальных товаров: {stats['unique_items']}")
             logger.info(f"Всего к печати: {stats['total_quantity']}")
 
             # PDF обработка
-            with PDFProcessor() as processor:
-                pdf_dir = processor.extract_zip(zip_path)
+            with PDFProcessor(raw_print=Config.PRINT_RAW) as processor:
                 output_path = Config.get_output_filepath(supply_id)
-                merge_stats = processor.merge_pdfs(items, pdf_dir, output_path)
+                zip_ref = processor.open_zip(zip_path)
+                merge_stats = processor.merge_pdfs(items, zip_ref, output_path)
 
                 logger.info(f"Создано страниц: {merge_stats['total_pages']}")
                 logger.info(f"Файл сохранен: {output_path}")
@@ -313,6 +390,9 @@ class OzonBarcodeGUI:
                 if merge_stats['skipped_items'] > 0:
                     logger.warning(f"Пропущено товаров: {merge_stats['skipped_items']}")
 
+                if merge_stats['zero_quantity_items'] > 0:
+                    logger.info(f"Товаров с нулевым количеством (не печатаются): {merge_stats['zero_quantity_items']}")
+
                 # Печать
                 if auto_print:
                     if processor.print_pdf(output_path, printer_name):
@@ -320,7 +400,8 @@ class OzonBarcodeGUI:
                     else:
                         logger.warning("Не удалось отправить файл на печать")
 
-            messagebox.showinfo(
+            self._ui(
+                messagebox.showinfo,
                 "Успех",
                 f"Обработка завершена!\n\n"
                 f"Создано страниц: {merge_stats['total_pages']}\n"
@@ -329,47 +410,46 @@ class OzonBarcodeGUI:
 
         except OzonAPIError as e:
             logger.error(f"Ошибка API: {str(e)}")
-            messagebox.showerror("Ошибка API", str(e))
+            self._ui(messagebox.showerror, "Ошибка API", str(e))
 
         except PDFProcessorError as e:
             logger.error(f"Ошибка обработки PDF: {str(e)}")
-            messagebox.showerror("Ошибка обработки PDF", str(e))
+            self._ui(messagebox.showerror, "Ошибка обработки PDF", str(e))
 
         except Exception as e:
             logger.error(f"Неожиданная ошибка: {str(e)}", exc_info=True)
-            messagebox.showerror("Ошибка", f"Неожиданная ошибка:\n{str(e)}")
+            self._ui(messagebox.showerror, "Ошибка", f"Неожиданная ошибка:\n{str(e)}")
 
         finally:
-            self.set_processing(False)
+            self._ui(self.set_processing, False)
 
     def validate_api(self):
         """Проверить API credentials"""
-        thread = threading.Thread(target=self._validate_api_thread)
-        thread.daemon = True
-        thread.start()
+        if self._is_busy():
+            return
+
+        self.set_processing(True)
+        self._submit(self._validate_api_thread)
 
     def _validate_api_thread(self):
         """Поток проверки API"""
         try:
-            self.set_processing(True)
-
-            logger = logging.getLogger(__name__)
             logger.info("Проверка API credentials...")
 
-            api = OzonAPI()
-            if api.validate_credentials():
-                logger.info("API credentials корректны")
-                messagebox.showinfo("Успех", "API credentials корректны")
-            else:
-                logger.error("Некорректные API credentials")
-                messagebox.showerror("Ошибка", "Некорректные API credentials")
+            with OzonAPI() as api:
+                if api.validate_credentials():
+                    logger.info("API credentials корректны")
+                    self._ui(messagebox.showinfo, "Успех", "API credentials корректны")
+                else:
+                    logger.error("Некорректные API credentials")
+                    self._ui(messagebox.showerror, "Ошибка", "Некорректные API credentials")
 
         except Exception as e:
             logger.error(f"Ошибка проверки API: {str(e)}")
-            messagebox.showerror("Ошибка", f"Ошибка проверки API:\n{str(e)}")
+            self._ui(messagebox.showerror, "Ошибка", f"Ошибка проверки API:\n{str(e)}")
 
         finally:
-            self.set_processing(False)
+            self._ui(self.set_processing, False)
 
     def clear_form(self):
         """Очистить форму"""
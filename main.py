@@ -1,15 +1,38 @@
 """
 Главный скрипт для автоматизации печати штрихкодов Ozon FBO
 """
+import io
+import os
 import sys
 import argparse
 import logging
 from pathlib import Path
 from typing import Optional
 
-from config import Config, logger
-from ozon_api import OzonAPI, OzonAPIError
-from pdf_processor import PDFProcessor, PDFProcessorError
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Разделители для вывода отчетов
+_BAR = "=" * 60
+_SUB = "-" * 60
+
+# Примеры использования для справки argparse
+_USAGE_EXAMPLES = """
+Примеры использования:
+
+  Интерактивный режим:
+    python main.py
+
+  С параметрами:
+    python main.py --supply-id 2000038461552 --zip-path barcode.zip
+
+  С автоматической печатью:
+    python main.py --supply-id 2000038461552 --zip-path barcode.zip --print
+
+  Указать принтер:
+    python main.py --supply-id 2000038461552 --zip-path barcode.zip --print --printer "Мой принтер"
+        """
 
 
 def process_supply(
@@ -30,36 +53,42 @@ def process_supply(
     Returns:
         True если обработка успешна, False иначе
     """
+    # Тяжелые модули загружаем только при реальной обработке
+    from ozon_api import OzonAPI, OzonAPIError
+    from pdf_processor import PDFProcessor, PDFProcessorError
+
+    # Локальные проверки выполняем до обращения к API
+    if not Path(zip_path).is_file():
+        logger.error(f"ZIP файл не найден: {zip_path}")
+        return False
+
     try:
         logger.info(f"Начало обработки поставки {supply_id}")
 
         # Инициализация API клиента
         logger.info("Подключение к Ozon API...")
-        api = OzonAPI()
+        with OzonAPI() as api:
+            # Получение данных о поставке
+            logger.info(f"Получение данных о поставке {supply_id}...")
+            items = api.get_supply_items(supply_id)
 
-        # Получение данных о поставке
-        logger.info(f"Получение данных о поставке {supply_id}...")
-        items = api.get_supply_items(supply_id)
+            if not items:
+                logger.error("Поставка не содержит товаров")
+                return False
 
-        if not items:
-            logger.error("Поставка не содержит товаров")
-            return False
+            stats = api.get_supply_statistics(supply_id, items=items)
 
         # Вывод статистики
-        stats = api.get_supply_statistics(supply_id)
         print_statistics(stats)
 
         # Обработка PDF
-        with PDFProcessor() as processor:
-            # Распаковка ZIP архива
-            logger.info("Распаковка ZIP архива...")
-            pdf_dir = processor.extract_zip(zip_path)
-
-            # Объединение PDF файлов
+        with PDFProcessor(raw_print=Config.PRINT_RAW) as processor:
+            # Объединение PDF файлов (читаются прямо из ZIP архива)
             output_path = Config.get_output_filepath(supply_id)
             logger.info("Объединение PDF файлов...")
 
-            merge_stats = processor.merge_pdfs(items, pdf_dir, output_path)
+            zip_ref = processor.open_zip(zip_path)
+            merge_stats = processor.merge_pdfs(items, zip_ref, output_path)
 
             # Вывод результатов
             print_merge_results(merge_stats, output_path)
@@ -89,62 +118,76 @@ def process_supply(
         return False
 
 
+def _trunc(s: str, n: int = 50) -> str:
+    """Обрезать длинное название до n символов с многоточием"""
+    return s if len(s) <= n else f"{s[:n - 3]}..."
+
+
 def print_statistics(stats: dict):
     """Вывести статистику поставки"""
-    print("\n" + "=" * 60)
-    print(f"СТАТИСТИКА ПОСТАВКИ {stats['supply_id']}")
-    print("=" * 60)
-    print(f"Уникальных товаров: {stats['unique_items']}")
-    print(f"Всего к печати: {stats['total_quantity']} штук")
-    print("\nСостав поставки:")
-    print("-" * 60)
-
+    buf = io.StringIO()
+    buf.write(f"\n{_BAR}\n")
+    buf.write(f"СТАТИСТИКА ПОСТАВКИ {stats['supply_id']}\n")
+    buf.write(f"{_BAR}\n")
+    buf.write(f"Уникальных товаров: {stats['unique_items']}\n")
+    buf.write(f"Всего к печати: {stats['total_quantity']} штук\n")
+    buf.write("\nСостав поставки:\n")
+    buf.write(f"{_SUB}\n")
+
+    lines = []
     for i, item in enumerate(stats['items'], 1):
-        sku = item.get('sku', 'N/A')
         barcode = item.get('barcode', 'N/A')
-        name = item.get('name', 'Неизвестный товар')
+        name = _trunc(item.get('name', 'Неизвестный товар'))
         quantity = item.get('quantity', 0)
 
-        # Обрезаем длинное название
-        if len(name) > 50:
-            name = name[:47] + "..."
-
-        print(f"{i:2d}. {barcode:<15} - {name:<50} ({quantity} шт)")
+        lines.append(f"{i:2d}. {barcode:<15} - {name:<50} ({quantity} шт)\n")
 
-    print("=" * 60 + "\n")
+    buf.write(''.join(lines))
+    buf.write(f"{_BAR}\n\n")
+    sys.stdout.write(buf.getvalue())
 
 
 def print_merge_results(stats: dict, output_path: Path):
     """Вывести результаты объединения PDF"""
-    print("\n" + "=" * 60)
-    print("РЕЗУЛЬТАТЫ ОБРАБОТКИ")
-    print("=" * 60)
-    print(f"Обработано товаров: {stats['processed_items']}/{stats['total_items']}")
-    print(f"Создано страниц: {stats['total_pages']}")
+    buf = io.StringIO()
+    buf.write(
+        f"\n{_BAR}\n"
+        "РЕЗУЛЬТАТЫ ОБРАБОТКИ\n"
+        f"{_BAR}\n"
+        f"Обработано товаров: {stats['processed_items']}/{stats['total_items']}\n"
+        f"Создано страниц: {stats['total_pages']}\n"
+    )
 
     if stats['skipped_items'] > 0:
-        print(f"\n⚠ Пропущено товаров: {stats['skipped_items']}")
+        buf.write(f"\n⚠ Пропущено товаров: {stats['skipped_items']}\n")
 
         if stats['missing_pdfs']:
-            print("\nТовары без PDF файлов:")
+            buf.write("\nТовары без PDF файлов:\n")
+            lines = []
             for item in stats['missing_pdfs']:
                 sku = item['sku']
-                name = item['name']
+                name = _trunc(item['name'])
                 quantity = item['quantity']
-                if len(name) > 50:
-                    name = name[:47] + "..."
-                print(f"  - SKU {sku}: {name} ({quantity} шт)")
+                lines.append(f"  - SKU {sku}: {name} ({quantity} шт)\n")
+            buf.write(''.join(lines))
 
-    print(f"\n✓ Создан файл: {output_path}")
-    print(f"  Размер: {output_path.stat().st_size / 1024:.1f} KB")
-    print("=" * 60 + "\n")
+    if stats['zero_quantity_items'] > 0:
+        buf.write(f"\nТоваров с нулевым количеством (не печатаются): {stats['zero_quantity_items']}\n")
+
+    size_kb = os.stat(output_path).st_size / 1024
+    buf.write(
+        f"\n✓ Создан файл: {output_path}\n"
+        f"  Размер: {size_kb:.1f} KB\n"
+        f"{_BAR}\n\n"
+    )
+    sys.stdout.write(buf.getvalue())
 
 
 def interactive_mode():
     """Интерактивный режим работы"""
-    print("\n" + "=" * 60)
+    print("\n" + _BAR)
     print("АВТОМАТИЗАЦИЯ ПЕЧАТИ ШТРИХКОДОВ OZON FBO")
-    print("=" * 60 + "\n")
+    print(_BAR + "\n")
 
     # Проверка конфигурации
     errors = Config.validate()
@@ -164,7 +207,9 @@ def interactive_mode():
         supply_id = int(supply_id)
 
         zip_path = input("Укажите путь к ZIP архиву: ").strip()
-        if not Path(zip_path).exists():
+        try:
+            os.stat(zip_path)
+        except OSError:
             print(f"✗ Файл не найден: {zip_path}")
             return False
 
@@ -193,21 +238,7 @@ def main():
     parser = argparse.ArgumentParser(
         description='Автоматизация печати штрихкодов для поставок Ozon FBO',
         formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Примеры использования:
-
-  Интерактивный режим:
-    python main.py
-
-  С параметрами:
-    python main.py --supply-id 2000038461552 --zip-path barcode.zip
-
-  С автоматической печатью:
-    python main.py --supply-id 2000038461552 --zip-path barcode.zip --print
-
-  Указать принтер:
-    python main.py --supply-id 2000038461552 --zip-path barcode.zip --print --printer "Мой принтер"
-        """
+        epilog=_USAGE_EXAMPLES
     )
 
     parser.add_argument(
@@ -256,20 +287,26 @@ def main():
         print("✓ Конфигурация корректна")
 
         print("\nПроверка API credentials...")
+        from ozon_api import OzonAPI
+
         try:
-            api = OzonAPI()
-            if api.validate_credentials():
-                print("✓ API credentials корректны")
-                return 0
-            else:
-                print("✗ Некорректные API credentials")
-                return 1
+            with OzonAPI() as api:
+                if api.validate_credentials():
+                    print("✓ API credentials корректны")
+                    return 0
+                else:
+                    print("✗ Некорректные API credentials")
+                    return 1
         except Exception as e:
             print(f"✗ Ошибка проверки API: {str(e)}")
             return 1
 
     # Режим с параметрами
     if args.supply_id and args.zip_path:
+        if not Path(args.zip_path).is_file():
+            print(f"✗ Файл не найден: {args.zip_path}")
+            return 1
+
         success = process_supply(
             args.supply_id,
             args.zip_path,
@@ -1,14 +1,71 @@
 """
 Модуль для работы с Ozon API
 """
+import json
 import requests
 import logging
-from typing import Dict, List, Optional
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from config import Config
 
+# orjson (опционально) сериализует запросы и разбирает ответы API заметно
+# быстрее стандартного json
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
 
+def _normalize_items(items: List[Dict]) -> List[Dict]:
+    """
+    Привести количество товаров к int
+
+    API может вернуть количество строкой; некорректное значение считается
+    нулевым (такой товар не печатается)
+    """
+    normalized = []
+    for item in items:
+        quantity = item.get('quantity')
+        if quantity is None or type(quantity) is int:
+            normalized.append(item)
+            continue
+
+        try:
+            quantity = int(quantity)
+        except (TypeError, ValueError):
+            logger.warning("Некорректное количество %r для SKU %s", quantity, item.get('sku'))
+            quantity = 0
+        normalized.append({**item, 'quantity': quantity})
+    return normalized
+
+
+def _sum_quantity(items: List[Dict]) -> int:
+    """Общее количество единиц товаров"""
+    return sum(item.get('quantity', 0) for item in items)
+
+
+class _BoundedRetry(Retry):
+    """Retry с ограничением паузы по заголовку Retry-After"""
+
+    # Максимальная пауза перед повтором по Retry-After (сек): большие значения
+    # от сервера не должны блокировать обработку на часы
+    RETRY_AFTER_MAX = 30
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.RETRY_AFTER_MAX)
+
+
 class OzonAPIError(Exception):
     """Исключение для ошибок Ozon API"""
     pass
@@ -17,6 +74,13 @@ class OzonAPIError(Exception):
 class OzonAPI:
     """Класс для работы с Ozon Seller API"""
 
+    # Время жизни кэша ответов API (секунды)
+    CACHE_TTL = 60
+    # Количество товаров на странице ответа /v1/supply-order/bundle
+    BUNDLE_PAGE_LIMIT = 100
+    # Таймауты запроса (секунды): установка соединения, чтение ответа
+    REQUEST_TIMEOUT = (3.05, 27)
+
     def __init__(self, client_id: Optional[str] = None, api_key: Optional[str] = None):
         """
         Инициализация клиента Ozon API
@@ -32,15 +96,78 @@ class OzonAPI:
         if not self.client_id or not self.api_key:
             raise OzonAPIError("Client-Id и API-Key должны быть указаны")
 
-    def _get_headers(self) -> Dict[str, str]:
-        """Получить заголовки для API запросов"""
-        return {
+        # Заголовки неизменны для клиента, собираем их один раз
+        self._headers = {
             'Client-Id': self.client_id,
             'Api-Key': self.api_key,
             'Content-Type': 'application/json'
         }
 
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Dict:
+        # Одна сессия на клиента: keep-alive соединения переиспользуются
+        # между запросами, временные ошибки сервера повторяются автоматически
+        retry = _BoundedRetry(
+            total=3,
+            connect=3,
+            read=2,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=['GET', 'POST'],
+            respect_retry_after_header=True,
+            # После исчерпания попыток возвращаем последний ответ, чтобы
+            # raise_for_status сообщил код и текст ошибки
+            raise_on_status=False
+        )
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=10,
+            max_retries=retry
+        ))
+        self._session.headers.update(self._headers)
+
+        # Кэш ответов: ключ -> (время получения, данные)
+        self._cache: Dict[Tuple, Tuple[float, Any]] = {}
+
+    def _cache_get(self, key: Tuple) -> Optional[Any]:
+        """Получить данные из кэша, если они не устарели"""
+        cached = self._cache.get(key)
+        if cached is None:
+            return None
+
+        timestamp, value = cached
+        if time.monotonic() - timestamp >= self.CACHE_TTL:
+            del self._cache[key]
+            return None
+
+        return value
+
+    def _cache_put(self, key: Tuple, value: Any):
+        """Сохранить данные в кэш"""
+        self._cache[key] = (time.monotonic(), value)
+
+    @staticmethod
+    def _unwrap(result: Dict, key: str) -> Any:
+        """
+        Извлечь поле из ответа API
+
+        Ответ может быть как обернут в 'result', так и плоским
+
+        Args:
+            result: Ответ API
+            key: Имя поля
+
+        Returns:
+            Значение поля или None, если его нет
+        """
+        return (result.get('result') or result).get(key)
+
+    def _make_request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict] = None,
+        auth_only: bool = False
+    ) -> Dict:
         """
         Выполнить запрос к API
 
@@ -48,30 +175,40 @@ class OzonAPI:
             method: HTTP метод (GET, POST, etc.)
             endpoint: Endpoint API
             data: Данные для отправки
+            auth_only: Проверить только авторизацию: успехом считаются ответы
+                2xx и 400 (запрос отклонен уже после авторизации), тело ответа
+                не разбирается
 
         Returns:
-            Ответ от API в виде словаря
+            Ответ от API в виде словаря (пустой словарь при auth_only)
 
         Raises:
             OzonAPIError: При ошибке запроса
         """
         url = f"{self.base_url}{endpoint}"
-        headers = self._get_headers()
 
         try:
-            logger.info(f"Запрос к API: {method} {url}")
+            logger.info("Запрос к API: %s %s", method, url)
 
             if method.upper() == 'POST':
-                response = requests.post(url, json=data, headers=headers, timeout=30)
+                response = self._session.post(url, data=_json_dumps(data), timeout=self.REQUEST_TIMEOUT)
             elif method.upper() == 'GET':
-                response = requests.get(url, params=data, headers=headers, timeout=30)
+                response = self._session.get(url, params=data, timeout=self.REQUEST_TIMEOUT)
             else:
                 raise OzonAPIError(f"Неподдерживаемый HTTP метод: {method}")
 
+            if auth_only:
+                if not (200 <= response.status_code < 300 or response.status_code == 400):
+                    raise requests.exceptions.HTTPError(
+                        f"{response.status_code} {response.reason}", response=response
+                    )
+                logger.info("Авторизация в API подтверждена: %s", response.status_code)
+                return {}
+
             response.raise_for_status()
-            result = response.json()
+            result = _json_loads(response.content)
 
-            logger.info(f"Успешный ответ от API: {response.status_code}")
+            logger.info("Успешный ответ от API: %s", response.status_code)
             return result
 
         except requests.exceptions.HTTPError as e:
@@ -103,26 +240,49 @@ class OzonAPI:
             supply_id: ID поставки
 
         Returns:
-            Словарь с данными о поставке
+            Словарь с данными о поставке: товары со всех страниц ответа
 
         Raises:
             OzonAPIError: При ошибке получения данных
         """
-        logger.info(f"Получение данных поставки {supply_id}")
+        cache_key = ('bundle', supply_id)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            logger.info("Данные поставки %s получены из кэша", supply_id)
+            return cached
+
+        logger.info("Получение данных поставки %s", supply_id)
 
         endpoint = '/v1/supply-order/bundle'
         data = {
             'bundle_ids': [str(supply_id)],
-            'limit': 100
+            'limit': self.BUNDLE_PAGE_LIMIT
         }
 
         try:
-            result = self._make_request('POST', endpoint, data)
-
-            if 'result' not in result:
-                raise OzonAPIError("Неверный формат ответа от API")
-
-            return result['result']
+            items = []
+            while True:
+                result = self._make_request('POST', endpoint, data)
+
+                if not isinstance(result, dict):
+                    raise OzonAPIError("Неверный формат ответа от API")
+
+                page_items = self._unwrap(result, 'items')
+                if page_items is None:
+                    raise OzonAPIError("В ответе API отсутствует список товаров")
+                items.extend(page_items)
+
+                # Следующая страница запрашивается по last_id предыдущей
+                last_id = self._unwrap(result, 'last_id')
+                has_next = self._unwrap(result, 'has_next')
+                if not has_next or not last_id or last_id == data.get('last_id'):
+                    break
+                data['last_id'] = last_id
+                logger.info("Получение следующей страницы товаров поставки %s", supply_id)
+
+            bundle = {'items': items}
+            self._cache_put(cache_key, bundle)
+            return bundle
 
         except OzonAPIError:
             raise
@@ -147,17 +307,13 @@ class OzonAPI:
         try:
             bundle_data = self.get_supply_bundle(supply_id)
 
-            if 'items' not in bundle_data:
+            items = self._unwrap(bundle_data, 'items')
+            if items is None:
                 raise OzonAPIError("В ответе API отсутствует список товаров")
 
-            items = bundle_data['items']
-            logger.info(f"Получено {len(items)} уникальных товаров в поставке")
-
-            # Подсчитываем общее количество товаров
-            total_quantity = sum(item.get('quantity', 0) for item in items)
-            logger.info(f"Всего товаров к печати: {total_quantity}")
+            logger.info("Получено %d уникальных товаров в поставке", len(items))
 
-            return items
+            return _normalize_items(items)
 
         except OzonAPIError:
             raise
@@ -166,21 +322,23 @@ class OzonAPI:
             logger.error(error_msg)
             raise OzonAPIError(error_msg)
 
-    def get_supply_statistics(self, supply_id: int) -> Dict:
+    def get_supply_statistics(self, supply_id: int, items: Optional[List[Dict]] = None) -> Dict:
         """
         Получить статистику по поставке
 
         Args:
             supply_id: ID поставки
+            items: Уже полученный список товаров (если не указан, запрашивается из API)
 
         Returns:
             Словарь со статистикой поставки
         """
         try:
-            items = self.get_supply_items(supply_id)
+            if items is None:
+                items = self.get_supply_items(supply_id)
 
             total_unique = len(items)
-            total_quantity = sum(item.get('quantity', 0) for item in items)
+            total_quantity = _sum_quantity(items)
 
             stats = {
                 'supply_id': supply_id,
@@ -189,9 +347,8 @@ class OzonAPI:
                 'items': items
             }
 
-            logger.info(f"Статистика поставки {supply_id}: "
-                       f"{total_unique} уникальных товаров, "
-                       f"{total_quantity} штук всего")
+            logger.info("Статистика поставки %s: %d уникальных товаров, %d штук всего",
+                        supply_id, total_unique, total_quantity)
 
             return stats
 
@@ -220,10 +377,23 @@ class OzonAPI:
                 'sort_dir': 'DESC'
             }
 
-            self._make_request('POST', endpoint, data)
+            # Для проверки достаточно статуса ответа, тело не разбираем
+            self._make_request('POST', endpoint, data, auth_only=True)
             logger.info("API credentials валидны")
             return True
 
         except OzonAPIError as e:
-            logger.error(f"Некорректные API credentials: {str(e)}")
+            logger.error("Некорректные API credentials: %s", e)
             return False
+
+    def close(self):
+        """Закрыть HTTP сессию и освободить соединения"""
+        self._session.close()
+
+    def __enter__(self):
+        """Контекстный менеджер: вход"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Контекстный менеджер: выход"""
+        self.close()
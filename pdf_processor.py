@@ -1,15 +1,34 @@
 """
 Модуль для обработки PDF файлов со штрихкодами
 """
+import io
+import os
 import logging
+import threading
 import zipfile
 import tempfile
 import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import List, Dict, Optional
-from PyPDF2 import PdfReader, PdfWriter
+from typing import Any, List, Dict, Optional, Union
+# pypdf - поддерживаемое продолжение PyPDF2; PyPDF2 остается запасным вариантом
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:
+    from PyPDF2 import PdfReader, PdfWriter
 import platform
 
+# pywin32 нужен только для печати на Windows
+try:
+    import win32api
+    import win32print
+    _HAS_WIN32 = True
+except ImportError:
+    _HAS_WIN32 = False
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,16 +40,104 @@ class PDFProcessorError(Exception):
 class PDFProcessor:
     """Класс для обработки PDF файлов со штрихкодами"""
 
-    def __init__(self):
-        """Инициализация процессора PDF"""
+    # Максимум потоков для параллельного чтения и распаковки PDF файлов
+    MAX_WORKERS = 8
+    # Файлы крупнее этого размера (байт) PdfReader читает с диска сам
+    MAX_INMEMORY_PDF_SIZE = 8 * 1024 * 1024
+    # Размер буфера записи итогового PDF (байт)
+    WRITE_BUFFER_SIZE = 1 << 20
+    # Размер буфера копирования при распаковке элементов архива (байт)
+    EXTRACT_BUFFER_SIZE = 256 * 1024
+
+    def __init__(self, raw_print: bool = False):
+        """
+        Инициализация процессора PDF
+
+        Args:
+            raw_print: На Windows отправлять PDF на принтер напрямую (RAW),
+                без запуска программы просмотра PDF. Принтер должен сам
+                принимать PDF (например, многие термопринтеры этикеток)
+        """
         self.temp_dir = None
+        self._zip_lock = threading.Lock()
+        self._cleanup_thread = None
+
+        # Открытый ZIP архив, общий для распаковки и чтения PDF (закрывается в cleanup)
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._zip_path: Optional[Path] = None
+        # Распакованные во временную директорию PDF: имя в нижнем регистре -> имя файла
+        self._extracted_names: Optional[Dict[str, str]] = None
+
+        # Платформа не меняется во время работы, способ печати выбираем один раз
+        self._system = platform.system()
+        self._print_impl = {
+            'Windows': self._print_pdf_windows_raw if raw_print else self._print_pdf_windows,
+            'Darwin': self._print_pdf_macos,  # macOS
+            'Linux': self._print_pdf_linux
+        }.get(self._system)
+        # Платформы, где несколько файлов печатаются одной командой
+        self._batch_print_impl = {
+            'Darwin': self._print_pdfs_macos,
+            'Linux': self._print_pdfs_linux
+        }.get(self._system)
+
+    def open_zip(self, zip_path: str) -> zipfile.ZipFile:
+        """
+        Открыть ZIP архив с PDF файлами для чтения без распаковки
+
+        Архив открывается один раз и используется процессором повторно
+        (распаковка, поиск и чтение PDF), закрывается в cleanup()
+
+        Args:
+            zip_path: Путь к ZIP архиву
+
+        Returns:
+            Открытый ZipFile
 
-    def extract_zip(self, zip_path: str) -> Path:
+        Raises:
+            PDFProcessorError: При ошибке открытия
+        """
+        try:
+            zip_path = Path(zip_path)
+
+            if self._zip is not None and self._zip_path == zip_path:
+                return self._zip
+
+            if not zip_path.exists():
+                raise PDFProcessorError(f"ZIP файл не найден: {zip_path}")
+
+            if not zip_path.is_file() or not zipfile.is_zipfile(zip_path):
+                raise PDFProcessorError(f"Файл не является ZIP архивом: {zip_path}")
+
+            self._close_zip()
+
+            logger.info(f"Открытие архива: {zip_path}")
+            self._zip = zipfile.ZipFile(zip_path, 'r')
+            self._zip_path = zip_path
+            return self._zip
+
+        except PDFProcessorError as e:
+            logger.error(str(e))
+            raise
+
+        except zipfile.BadZipFile as e:
+            error_msg = f"Поврежденный ZIP архив: {str(e)}"
+            logger.error(error_msg)
+            raise PDFProcessorError(error_msg)
+
+        except Exception as e:
+            error_msg = f"Ошибка при открытии ZIP: {str(e)}"
+            logger.error(error_msg)
+            raise PDFProcessorError(error_msg)
+
+    def extract_zip(self, zip_path: str, skus: Optional[List[int]] = None) -> Path:
         """
         Распаковать ZIP архив с PDF файлами
 
         Args:
             zip_path: Путь к ZIP архиву
+            skus: SKU товаров поставки; если указаны, распаковываются только
+                PDF файлы, которые могут им соответствовать (см. find_pdf_by_sku)
 
         Returns:
             Path: Путь к директории с распакованными файлами
@@ -53,12 +160,20 @@ class PDFProcessor:
 
             # Распаковываем архив
             logger.info(f"Распаковка архива: {zip_path}")
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(self.temp_dir)
-
-            # Подсчитываем количество PDF файлов
-            pdf_files = list(self.temp_dir.glob('*.pdf'))
-            logger.info(f"Распаковано PDF файлов: {len(pdf_files)}")
+            zip_ref = self.open_zip(zip_path)
+            members = zip_ref.infolist()
+            if skus is not None:
+                members = self._select_zip_members(members, skus)
+
+            self._extract_members(zip_path, members, zip_ref)
+
+            # Запоминаем распакованные PDF файлы из корня архива: по ним идет
+            # поиск и подсчет без повторного чтения директории
+            self._extracted_names = {
+                info.filename.lower(): info.filename for info in members
+                if '/' not in info.filename and info.filename.lower().endswith('.pdf')
+            }
+            logger.info(f"Распаковано PDF файлов: {len(self._extracted_names)}")
 
             return self.temp_dir
 
@@ -72,46 +187,292 @@ class PDFProcessor:
             logger.error(error_msg)
             raise PDFProcessorError(error_msg)
 
-    def find_pdf_by_sku(self, sku: int, search_dir: Path) -> Optional[Path]:
+    def _extract_members(
+        self,
+        zip_path: Path,
+        members: List[zipfile.ZipInfo],
+        zip_ref: Optional[zipfile.ZipFile] = None
+    ):
+        """
+        Распаковать элементы архива во временную директорию
+
+        Распаковка идет в несколько потоков: каждый открывает архив отдельно
+        (ZipFile нельзя разделять между потоками) и распаковывает свою часть
+        элементов. Распаковка zlib отпускает GIL, поэтому потоки работают
+        параллельно
+
+        Args:
+            zip_path: Путь к ZIP архиву
+            members: Элементы архива для распаковки
+            zip_ref: Уже открытый архив; используется, если распаковка идет
+                в одном потоке
+        """
+        workers = min(self.MAX_WORKERS, os.cpu_count() or 1, len(members))
+
+        def extract_shard(shard: List[zipfile.ZipInfo]):
+            with zipfile.ZipFile(zip_path, 'r') as shard_zip:
+                for info in shard:
+                    self._extract_member(shard_zip, info)
+
+        started = time.perf_counter()
+
+        if workers <= 1:
+            if zip_ref is not None:
+                for info in members:
+                    self._extract_member(zip_ref, info)
+            else:
+                extract_shard(members)
+        else:
+            shards = [members[i::workers] for i in range(workers)]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # list() пробрасывает исключения из потоков
+                list(executor.map(extract_shard, shards))
+
+        logger.debug(
+            f"Распаковка {len(members)} элементов ({max(workers, 1)} потоков): "
+            f"{time.perf_counter() - started:.3f} с"
+        )
+
+    def _extract_member(self, zip_ref: zipfile.ZipFile, info: zipfile.ZipInfo):
+        """
+        Распаковать один элемент архива во временную директорию
+
+        Файлы из корня архива копируются потоком с увеличенным буфером, прочие
+        элементы (директории, вложенные пути) распаковываются штатно через
+        ZipFile.extract, который проверяет безопасность путей
+
+        Args:
+            zip_ref: Открытый ZIP архив
+            info: Элемент архива
+        """
+        name = info.filename
+        if info.is_dir() or not name or name in ('.', '..') or any(c in name for c in '/\\:'):
+            zip_ref.extract(info, self.temp_dir)
+            return
+
+        with zip_ref.open(info) as src, open(self.temp_dir / name, 'wb') as dst:
+            shutil.copyfileobj(src, dst, length=self.EXTRACT_BUFFER_SIZE)
+
+    @staticmethod
+    def _candidate_names(sku: int) -> List[str]:
+        """Варианты имен PDF файла для SKU в порядке приоритета"""
+        return [
+            f"{sku}.pdf",
+            f"OZN{sku}.pdf",
+            f"{sku}_barcode.pdf"
+        ]
+
+    def _select_zip_members(
+        self,
+        infolist: List[zipfile.ZipInfo],
+        skus: List[int]
+    ) -> List[zipfile.ZipInfo]:
+        """
+        Отобрать элементы архива, нужные для поиска PDF по SKU
+
+        Берутся только PDF файлы в корне архива (поиск идет только по ним):
+        для каждого SKU - файл с точным именем, а если его нет, то все файлы,
+        содержащие SKU в имени
+
+        Args:
+            infolist: Элементы ZIP архива
+            skus: SKU товаров
+
+        Returns:
+            Список элементов архива для распаковки
+        """
+        # Имена сравниваются без учета регистра (123.PDF, ozn123.pdf)
+        by_name = {
+            info.filename.lower(): info for info in infolist
+            if '/' not in info.filename and info.filename.lower().endswith('.pdf')
+        }
+
+        selected = {}
+        for sku in dict.fromkeys(skus):
+            exact = next(
+                (name.lower() for name in self._candidate_names(sku) if name.lower() in by_name),
+                None
+            )
+            if exact is not None:
+                selected[exact] = by_name[exact]
+                continue
+
+            sku_str = str(sku)
+            for name, info in by_name.items():
+                if sku_str in name[:-4]:
+                    selected[name] = info
+
+        return list(selected.values())
+
+    def _build_zip_index(self, zip_ref: zipfile.ZipFile) -> Dict[str, str]:
+        """
+        Составить индекс PDF файлов в корне ZIP архива
+
+        Args:
+            zip_ref: Открытый ZIP архив
+
+        Returns:
+            Словарь: имя файла в нижнем регистре -> имя элемента архива
+        """
+        return {
+            name.lower(): name for name in zip_ref.namelist()
+            if '/' not in name and name.lower().endswith('.pdf')
+        }
+
+    def _build_pdf_index(self, search_dir: Path) -> Dict[str, Path]:
+        """
+        Составить индекс PDF файлов директории за один проход
+
+        Args:
+            search_dir: Директория для поиска
+
+        Returns:
+            Словарь: имя файла в нижнем регистре -> путь к файлу
+        """
+        index = {}
+        with os.scandir(search_dir) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith('.pdf') and entry.is_file():
+                    index[entry.name.lower()] = Path(entry.path)
+        return index
+
+    def find_pdf_by_sku(
+        self,
+        sku: int,
+        search_dir: Path,
+        index: Optional[Dict[str, Path]] = None
+    ) -> Optional[Path]:
         """
         Найти PDF файл по SKU
 
         Args:
             sku: SKU товара
             search_dir: Директория для поиска
+            index: Индекс PDF файлов директории (см. _build_pdf_index);
+                если указан, файловая система не опрашивается
 
         Returns:
             Path к PDF файлу или None если не найден
         """
+        if index is not None:
+            return self._match_sku(sku, index)
+
         # Пробуем разные варианты имен файлов
-        possible_names = [
-            f"{sku}.pdf",
-            f"OZN{sku}.pdf",
-            f"{sku}_barcode.pdf"
-        ]
+        possible_names = self._candidate_names(sku)
+
+        if self._extracted_names is not None and search_dir == self.temp_dir:
+            # Директория распакована этим процессором: точные имена проверяем
+            # по списку распакованных файлов, без обращения к диску
+            for name in possible_names:
+                extracted = self._extracted_names.get(name.lower())
+                if extracted is not None:
+                    logger.debug(f"Найден PDF для SKU {sku}: {extracted}")
+                    return search_dir / extracted
+        else:
+            for name in possible_names:
+                pdf_path = search_dir / name
+                if pdf_path.exists():
+                    logger.debug(f"Найден PDF для SKU {sku}: {pdf_path.name}")
+                    return pdf_path
+
+        # Если не нашли по точному совпадению, ищем файлы содержащие SKU в имени
+        sku_str = str(sku)
+        with os.scandir(search_dir) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith('.pdf') and sku_str in entry.name[:-4]:
+                    logger.debug(f"Найден PDF для SKU {sku} по частичному совпадению: {entry.name}")
+                    return Path(entry.path)
+
+        logger.warning(f"Не найден PDF для SKU {sku}")
+        return None
+
+    def find_pdf_by_sku_in_zip(self, sku: int, namelist_index: Dict[str, str]) -> Optional[str]:
+        """
+        Найти PDF файл по SKU в ZIP архиве
+
+        Args:
+            sku: SKU товара
+            namelist_index: Индекс PDF файлов архива (см. _build_zip_index)
 
-        for name in possible_names:
-            pdf_path = search_dir / name
-            if pdf_path.exists():
-                logger.debug(f"Найден PDF для SKU {sku}: {pdf_path.name}")
-                return pdf_path
+        Returns:
+            Имя элемента архива или None если не найден
+        """
+        return self._match_sku(sku, namelist_index)
+
+    def _match_sku(self, sku: int, index: Dict[str, Any]) -> Optional[Any]:
+        """
+        Найти PDF файл для SKU в индексе имен файлов
+
+        Args:
+            sku: SKU товара
+            index: Словарь: имя PDF файла в нижнем регистре -> путь к файлу
+                или элемент архива
+
+        Returns:
+            Значение из индекса или None если не найден
+        """
+        # Пробуем разные варианты имен файлов
+        # Ключи индекса - имена в нижнем регистре
+        for name in self._candidate_names(sku):
+            pdf_file = index.get(name.lower())
+            if pdf_file is not None:
+                logger.debug(f"Найден PDF для SKU {sku}: {name}")
+                return pdf_file
 
         # Если не нашли по точному совпадению, ищем файлы содержащие SKU в имени
-        for pdf_file in search_dir.glob('*.pdf'):
-            if str(sku) in pdf_file.stem:
-                logger.debug(f"Найден PDF для SKU {sku} по частичному совпадению: {pdf_file.name}")
+        sku_str = str(sku)
+        for name, pdf_file in index.items():
+            if sku_str in name[:-4]:
+                logger.debug(f"Найден PDF для SKU {sku} по частичному совпадению: {name}")
                 return pdf_file
 
         logger.warning(f"Не найден PDF для SKU {sku}")
         return None
 
-    def merge_pdfs(self, items: List[Dict], pdf_dir: Path, output_path: Path) -> Dict:
+    def _load_pdf(self, pdf_file: Union[Path, str], zip_ref: Optional[zipfile.ZipFile] = None):
+        """
+        Разобрать PDF файл
+
+        Ошибка возвращается вместо исключения, чтобы при параллельном чтении
+        ее можно было обработать для каждого товара отдельно
+
+        Args:
+            pdf_file: Путь к PDF файлу или имя элемента архива
+            zip_ref: Открытый ZIP архив, если PDF читается из него
+
+        Returns:
+            PdfReader или исключение, возникшее при чтении
+        """
+        try:
+            if zip_ref is not None:
+                # ZipFile не рассчитан на одновременное чтение из нескольких
+                # потоков, поэтому чтение из архива сериализуется
+                with self._zip_lock:
+                    data = zip_ref.read(pdf_file)
+                return PdfReader(io.BytesIO(data), strict=False)
+
+            # Небольшие файлы читаем целиком одним вызовом и разбираем из памяти
+            pdf_file = Path(pdf_file)
+            if pdf_file.stat().st_size <= self.MAX_INMEMORY_PDF_SIZE:
+                return PdfReader(io.BytesIO(pdf_file.read_bytes()), strict=False)
+
+            return PdfReader(pdf_file, strict=False)
+        except Exception as e:
+            return e
+
+    def merge_pdfs(
+        self,
+        items: List[Dict],
+        pdf_source: Union[Path, zipfile.ZipFile],
+        output_path: Path
+    ) -> Dict:
         """
         Объединить PDF файлы с учетом количества товаров
 
         Args:
             items: Список товаров с информацией о SKU и количестве
-            pdf_dir: Директория с PDF файлами
+            pdf_source: Директория с PDF файлами или открытый ZIP архив
+                (PDF читаются из него напрямую, без распаковки)
             output_path: Путь к выходному PDF файлу
 
         Returns:
@@ -129,18 +490,51 @@ class PDFProcessor:
                 'total_pages': 0,
                 'processed_items': 0,
                 'skipped_items': 0,
+                'zero_quantity_items': 0,
                 'missing_pdfs': []
             }
 
+            # Список PDF файлов получаем один раз на все товары
+            if isinstance(pdf_source, zipfile.ZipFile):
+                zip_ref = pdf_source
+                zip_index = self._build_zip_index(zip_ref)
+                find_pdf = partial(self.find_pdf_by_sku_in_zip, namelist_index=zip_index)
+            else:
+                zip_ref = None
+                pdf_index = self._build_pdf_index(pdf_source)
+                find_pdf = partial(self.find_pdf_by_sku, search_dir=pdf_source, index=pdf_index)
+
+            # Первый проход: сопоставляем товары с PDF файлами. Результат поиска
+            # запоминается по SKU, повторяющиеся товары не ищутся заново
+            resolved = []
+            sku_files: Dict[object, Optional[Path]] = {}
             for item in items:
                 sku = item.get('sku')
                 quantity = item.get('quantity', 1)
                 name = item.get('name', 'Неизвестный товар')
 
+                # Количество может прийти строкой; товары без штук не печатаются,
+                # и их PDF не ищется
+                try:
+                    quantity = int(quantity)
+                except (TypeError, ValueError):
+                    logger.warning(f"Пропущен товар {sku} ({name}): некорректное количество {quantity!r}")
+                    stats['skipped_items'] += 1
+                    continue
+
+                if quantity <= 0:
+                    logger.info(f"Пропущен товар {sku} ({name}): количество {quantity}")
+                    stats['zero_quantity_items'] += 1
+                    continue
+
                 logger.info(f"Обработка товара: SKU {sku}, количество: {quantity}")
 
                 # Ищем PDF файл
-                pdf_file = self.find_pdf_by_sku(sku, pdf_dir)
+                if sku in sku_files:
+                    pdf_file = sku_files[sku]
+                else:
+                    pdf_file = find_pdf(sku)
+                    sku_files[sku] = pdf_file
 
                 if pdf_file is None:
                     logger.warning(f"Пропущен товар {sku} ({name}): PDF не найден")
@@ -152,12 +546,27 @@ class PDFProcessor:
                     })
                     continue
 
-                # Читаем PDF файл
+                resolved.append((sku, quantity, pdf_file))
+
+            # Разбираем уникальные PDF файлы параллельно: каждый файл читается
+            # один раз, а его содержимое разделяется всеми копиями страницы
+            unique_files = list(dict.fromkeys(pdf_file for _, _, pdf_file in resolved))
+            readers = {}
+            if unique_files:
+                workers = min(self.MAX_WORKERS, len(unique_files))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    load_pdf = partial(self._load_pdf, zip_ref=zip_ref)
+                    readers = dict(zip(unique_files, executor.map(load_pdf, unique_files)))
+
+            # Второй проход: собираем итоговый PDF в исходном порядке товаров
+            for sku, quantity, pdf_file in resolved:
                 try:
-                    reader = PdfReader(pdf_file)
+                    reader = readers[pdf_file]
+                    if isinstance(reader, Exception):
+                        raise reader
 
                     if len(reader.pages) == 0:
-                        logger.warning(f"PDF файл {pdf_file.name} не содержит страниц")
+                        logger.warning(f"PDF файл {Path(pdf_file).name} не содержит страниц")
                         stats['skipped_items'] += 1
                         continue
 
@@ -165,15 +574,15 @@ class PDFProcessor:
                     page = reader.pages[0]
 
                     # Добавляем нужное количество копий
-                    for i in range(quantity):
+                    for _ in range(quantity):
                         output_pdf.add_page(page)
-                        stats['total_pages'] += 1
+                    stats['total_pages'] += quantity
 
                     stats['processed_items'] += 1
                     logger.info(f"Добавлено {quantity} копий для SKU {sku}")
 
                 except Exception as e:
-                    logger.error(f"Ошибка при чтении PDF {pdf_file.name}: {str(e)}")
+                    logger.error(f"Ошибка при чтении PDF {Path(pdf_file).name}: {str(e)}")
                     stats['skipped_items'] += 1
                     continue
 
@@ -185,8 +594,16 @@ class PDFProcessor:
             logger.info(f"Сохранение итогового PDF: {output_path}")
             output_path.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(output_path, 'wb') as output_file:
-                output_pdf.write(output_file)
+            # Пишем во временный файл рядом с итоговым и атомарно заменяем им
+            # итоговый, чтобы при ошибке не оставить недописанный PDF
+            part_path = output_path.with_suffix('.pdf.part')
+            try:
+                with open(part_path, 'wb', buffering=self.WRITE_BUFFER_SIZE) as output_file:
+                    output_pdf.write(output_file)
+                os.replace(part_path, output_path)
+            except BaseException:
+                part_path.unlink(missing_ok=True)
+                raise
 
             logger.info(f"Успешно создан PDF: {stats['total_pages']} страниц")
             logger.info(f"Обработано товаров: {stats['processed_items']}/{stats['total_items']}")
@@ -204,15 +621,57 @@ class PDFProcessor:
             logger.error(error_msg)
             raise PDFProcessorError(error_msg)
 
-    def cleanup(self):
-        """Очистить временные файлы"""
+    def cleanup(self, background: bool = False):
+        """
+        Очистить временные файлы
+
+        Args:
+            background: Удалять файлы в фоновом потоке, не задерживая вызывающий
+                код (процесс при завершении дожидается окончания удаления)
+        """
+        self._close_zip()
+        self._extracted_names = None
+
         if self.temp_dir and self.temp_dir.exists():
-            try:
-                logger.info(f"Очистка временной директории: {self.temp_dir}")
-                shutil.rmtree(self.temp_dir)
-                logger.info("Временные файлы удалены")
-            except Exception as e:
-                logger.warning(f"Не удалось удалить временные файлы: {str(e)}")
+            if background:
+                logger.info(f"Фоновая очистка временной директории: {self.temp_dir}")
+                self._cleanup_thread = threading.Thread(
+                    target=self._remove_temp_dir,
+                    args=(self.temp_dir,),
+                    name='pdf-cleanup'
+                )
+                self._cleanup_thread.start()
+                self.temp_dir = None
+                return
+
+            self._remove_temp_dir(self.temp_dir)
+
+    def _close_zip(self):
+        """Закрыть открытый процессором ZIP архив"""
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+            self._zip_path = None
+
+    @staticmethod
+    def _remove_temp_dir(temp_dir: Path):
+        """Удалить временную директорию"""
+        try:
+            logger.info(f"Очистка временной директории: {temp_dir}")
+            shutil.rmtree(temp_dir)
+            logger.info("Временные файлы удалены")
+        except Exception as e:
+            logger.warning(f"Не удалось удалить временные файлы: {str(e)}")
+
+    def join_cleanup(self, timeout: Optional[float] = None):
+        """
+        Дождаться завершения фоновой очистки временных файлов
+
+        Args:
+            timeout: Максимальное время ожидания в секундах
+        """
+        if self._cleanup_thread is not None:
+            self._cleanup_thread.join(timeout)
 
     def print_pdf(self, pdf_path: Path, printer_name: Optional[str] = None) -> bool:
         """
@@ -226,28 +685,52 @@ class PDFProcessor:
             True если печать успешно отправлена, False иначе
         """
         try:
-            system = platform.system()
-
-            if system == 'Windows':
-                return self._print_pdf_windows(pdf_path, printer_name)
-            elif system == 'Darwin':  # macOS
-                return self._print_pdf_macos(pdf_path, printer_name)
-            elif system == 'Linux':
-                return self._print_pdf_linux(pdf_path, printer_name)
-            else:
-                logger.error(f"Печать не поддерживается для платформы: {system}")
+            if self._print_impl is None:
+                logger.error(f"Печать не поддерживается для платформы: {self._system}")
                 return False
 
+            return self._print_impl(pdf_path, printer_name)
+
+        except Exception as e:
+            logger.error(f"Ошибка при печати PDF: {str(e)}")
+            return False
+
+    def print_pdfs(self, pdf_paths: List[Path], printer_name: Optional[str] = None) -> bool:
+        """
+        Отправить несколько PDF на печать
+
+        На macOS и Linux все файлы передаются одной командой печати, на
+        Windows отправляются по одному
+
+        Args:
+            pdf_paths: Пути к PDF файлам
+            printer_name: Имя принтера (если не указано, используется принтер по умолчанию)
+
+        Returns:
+            True если все файлы успешно отправлены на печать, False иначе
+        """
+        if not pdf_paths:
+            return True
+
+        try:
+            batch_impl = self._batch_print_impl
+            if batch_impl is not None:
+                return batch_impl(list(pdf_paths), printer_name)
+
+            results = [self.print_pdf(pdf_path, printer_name) for pdf_path in pdf_paths]
+            return all(results)
+
         except Exception as e:
             logger.error(f"Ошибка при печати PDF: {str(e)}")
             return False
 
     def _print_pdf_windows(self, pdf_path: Path, printer_name: Optional[str]) -> bool:
         """Печать на Windows"""
-        try:
-            import win32api
-            import win32print
+        if not _HAS_WIN32:
+            logger.error("Модуль pywin32 не установлен. Установите: pip install pywin32")
+            return False
 
+        try:
             if printer_name is None:
                 printer_name = win32print.GetDefaultPrinter()
 
@@ -265,51 +748,91 @@ class PDFProcessor:
             logger.info("Файл отправлен на печать")
             return True
 
-        except ImportError:
-            logger.error("Модуль pywin32 не установлен. Установите: pip install pywin32")
-            return False
         except Exception as e:
             logger.error(f"Ошибка печати на Windows: {str(e)}")
             return False
 
-    def _print_pdf_macos(self, pdf_path: Path, printer_name: Optional[str]) -> bool:
-        """Печать на macOS"""
+    def _print_pdf_windows_raw(self, pdf_path: Path, printer_name: Optional[str]) -> bool:
+        """Печать на Windows: передача PDF в очередь принтера как RAW данных"""
+        if not _HAS_WIN32:
+            logger.error("Модуль pywin32 не установлен. Установите: pip install pywin32")
+            return False
+
         try:
-            import subprocess
+            if not printer_name:
+                printer_name = win32print.GetDefaultPrinter()
 
-            cmd = ['lpr']
-            if printer_name:
-                cmd.extend(['-P', printer_name])
-            cmd.append(str(pdf_path))
+            logger.info(f"Отправка на печать (Windows, RAW): {pdf_path} -> {printer_name}")
 
-            logger.info(f"Отправка на печать (macOS): {' '.join(cmd)}")
+            pdf_bytes = Path(pdf_path).read_bytes()
+
+            printer = win32print.OpenPrinter(printer_name)
+            try:
+                win32print.StartDocPrinter(printer, 1, (Path(pdf_path).name, None, "RAW"))
+                try:
+                    win32print.StartPagePrinter(printer)
+                    win32print.WritePrinter(printer, pdf_bytes)
+                    win32print.EndPagePrinter(printer)
+                finally:
+                    win32print.EndDocPrinter(printer)
+            finally:
+                win32print.ClosePrinter(printer)
 
-            subprocess.run(cmd, check=True)
             logger.info("Файл отправлен на печать")
             return True
 
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Ошибка печати на macOS: {str(e)}")
+        except Exception as e:
+            logger.error(f"Ошибка печати на Windows: {str(e)}")
             return False
 
+    def _print_pdf_macos(self, pdf_path: Path, printer_name: Optional[str]) -> bool:
+        """Печать на macOS"""
+        return self._print_pdfs_macos([pdf_path], printer_name)
+
     def _print_pdf_linux(self, pdf_path: Path, printer_name: Optional[str]) -> bool:
         """Печать на Linux"""
-        try:
-            import subprocess
+        return self._print_pdfs_linux([pdf_path], printer_name)
+
+    def _print_pdfs_macos(self, pdf_paths: List[Path], printer_name: Optional[str]) -> bool:
+        """Печать нескольких файлов на macOS одной командой lpr"""
+        cmd = ['lpr']
+        if printer_name:
+            cmd.extend(['-P', printer_name])
+        return self._run_print_command(cmd, pdf_paths, 'macOS')
+
+    def _print_pdfs_linux(self, pdf_paths: List[Path], printer_name: Optional[str]) -> bool:
+        """Печать нескольких файлов на Linux одной командой lp"""
+        cmd = ['lp']
+        if printer_name:
+            cmd.extend(['-d', printer_name])
+        return self._run_print_command(cmd, pdf_paths, 'Linux')
+
+    def _run_print_command(self, cmd: List[str], pdf_paths: List[Path], system: str) -> bool:
+        """
+        Отправить файлы на печать командой CUPS
+
+        Args:
+            cmd: Команда печати с параметрами, без файлов
+            pdf_paths: Пути к PDF файлам
+            system: Название платформы для сообщений
 
-            cmd = ['lp']
-            if printer_name:
-                cmd.extend(['-d', printer_name])
-            cmd.append(str(pdf_path))
+        Returns:
+            True если печать успешно отправлена, False иначе
+        """
+        try:
+            cmd = cmd + [str(pdf_path) for pdf_path in pdf_paths]
 
-            logger.info(f"Отправка на печать (Linux): {' '.join(cmd)}")
+            logger.info(f"Отправка на печать ({system}): {' '.join(cmd)}")
 
             subprocess.run(cmd, check=True)
-            logger.info("Файл отправлен на печать")
+            if len(pdf_paths) == 1:
+                logger.info("Файл отправлен на печать")
+            else:
+                logger.info(f"Файлов отправлено на печать: {len(pdf_paths)}")
             return True
 
         except subprocess.CalledProcessError as e:
-            logger.error(f"Ошибка печати на Linux: {str(e)}")
+            logger.error(f"Ошибка печати на {system}: {str(e)}")
             return False
 
     def __enter__(self):
@@ -318,4 +841,4 @@ class PDFProcessor:
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Контекстный менеджер: выход"""
-        self.cleanup()
+        self.cleanup(background=True)